@@ -51,7 +51,7 @@ momentum = 0.65
 # --------------------------------------------------------------------------- #
 
 def generateSimTrajectories(bodykinpath,markersetpath,outputfile,alignMkR,alignMkL,
-                        fs,num_participants=100,max_len=240):
+                        fs,num_participants=100,max_len=240,fileformat='pickle'):
     '''
     Generate simulated marker trajectories to use for training the machine learning-
     based marker labelling algorithm. Trajectories are generated based on the defined 
@@ -65,7 +65,7 @@ def generateSimTrajectories(bodykinpath,markersetpath,outputfile,alignMkR,alignM
     markersetpath : string
         Path to .xml file of OpenSim marker set
     outputfile : string
-        Path to save .pickle file of training data
+        Path to save .pickle or .hdf5 file of training data
     alignMkR : string
         Markers to use to align person such that they face +x. This is for the right side.
         Suggest acromions or pelvis markers.
@@ -79,6 +79,11 @@ def generateSimTrajectories(bodykinpath,markersetpath,outputfile,alignMkR,alignM
         The default is 100.
     max_len : int, optional
         Max length of data segments. The default is 240.
+    fileformat : string, optional
+        Format of outputfile, either 'pickle' or 'hdf5'. The hdf5 format stores
+        all segments in a single chunked dataset so it can be inspected without
+        loading it fully. An hdf5 outputfile must end in .h5 or .hdf5 and a 
+        pickle outputfile must not. The default is 'pickle'.
 
     Returns
     -------
@@ -87,6 +92,13 @@ def generateSimTrajectories(bodykinpath,markersetpath,outputfile,alignMkR,alignM
         training data.
 
     '''
+    # Check output format before spending time generating data
+    if fileformat not in ['pickle','hdf5']:
+        raise ValueError("fileformat must be 'pickle' or 'hdf5', got '%s'" % fileformat)
+    if (os.path.splitext(outputfile)[1] in ['.h5','.hdf5']) != (fileformat == 'hdf5'):
+        raise ValueError("Extension of outputfile '%s' does not match fileformat '%s'" % 
+                         (outputfile,fileformat))
+    
     # Read marker set
     markers, segment, uniqueSegs, segID, mkcoordL, num_mks = import_markerSet(markersetpath)
     
@@ -110,12 +122,12 @@ def generateSimTrajectories(bodykinpath,markersetpath,outputfile,alignMkR,alignM
             pts = np.zeros((hf['kin'][sids[s]][t]['torso'].shape[2],len(markers),3))
             for m in range(len(markers)):
                 T = np.array(hf['kin'][sids[s]][t][segment[m]])
-                for i in range(T.shape[2]):
-                    p = np.ones((4,1))
-                    p[:3,0] = np.transpose((np.multiply(mkcoordL[m],scale[segment[m]][s,:]) - 
-                        com[segment[m]][s,:]) * 1000)
-                    p = np.matmul(T[:,:,i],p)
-                    pts[i,m,:] = np.transpose(np.matmul(R,p[:3,0]))
+                p = np.ones(4)
+                p[:3] = (np.multiply(mkcoordL[m],scale[segment[m]][s,:]) - 
+                        com[segment[m]][s,:]) * 1000
+                # Transform marker position for all frames at once (T is 4 x 4 x num_frames)
+                p = np.einsum('ijk,j->ki',T[:3,:,:],p)
+                pts[:T.shape[2],m,:] = np.matmul(p,R.T)
             cs = CubicSpline(np.arange(0,pts.shape[0],1),pts,axis=0)
             pts = cs(np.arange(0,pts.shape[0],120/fs)) # match sampling frequency of data to label
             pts = align(pts,markers.index(alignMkR),markers.index(alignMkL))
@@ -128,8 +140,11 @@ def generateSimTrajectories(bodykinpath,markersetpath,outputfile,alignMkR,alignM
             print('%d/%d complete' % (s+1,num_participants))
     hf.close()
     
-    with open(outputfile,'wb') as f:
-        pickle.dump(data,f)
+    if fileformat == 'hdf5':
+        export_simTrajectories_hdf5(data,outputfile)
+    else:
+        with open(outputfile,'wb') as f:
+            pickle.dump(data,f)
     
     print('Training data saved to ' + outputfile)
     
@@ -147,7 +162,7 @@ def trainAlgorithm(savepath,datapath,markersetpath,fs,num_epochs=10,prevModel=No
     savepath : string
         Folder where trained model should be saved.
     datapath : string
-        Full path to .pickle file containing simualted trajetory training data 
+        Full path to .pickle or .hdf5 file containing simualted trajetory training data 
         or folder containing labelled .c3d files to use as training data.
     markersetpath : string
         Path to .xml file of OpenSim marker set.
@@ -187,10 +202,9 @@ def trainAlgorithm(savepath,datapath,markersetpath,fs,num_epochs=10,prevModel=No
     # Read marker set
     markers, segment, uniqueSegs, segID, _, num_mks = import_markerSet(markersetpath)
     
-    if '.pickle' in datapath:
+    if os.path.isfile(datapath):
         # Import simulated trajectory data
-        with open(datapath,'rb') as f:
-            data_segs = pickle.load(f)
+        data_segs = import_simTrajectories(datapath)
 
         # Filter trajectories
         b, a = signal.butter(2,6,btype='low',fs=fs) # 2nd order, low-pass at 6 Hz 
@@ -212,7 +226,7 @@ def trainAlgorithm(savepath,datapath,markersetpath,fs,num_epochs=10,prevModel=No
         max_len = max([len(x) for x in data_segs])
        
         print('Loaded simulated trajectory training data')
-    else:
+    elif os.path.isdir(datapath):
         # Load labelled c3d files for training
         filelist = glob.glob(os.path.join(datapath,'*.c3d'))
         data_segs, windowIdx = import_labelled_c3ds(filelist,markers,
@@ -221,6 +235,8 @@ def trainAlgorithm(savepath,datapath,markersetpath,fs,num_epochs=10,prevModel=No
         max_len = max([x[3]-x[2] for x in windowIdx])
         
         print('Loaded c3ds files for training data')
+    else:
+        raise FileNotFoundError(datapath)
     
     # Calculate values to use to scale neural network inputs and distances between
     # markers on same body segment to use for label verification
@@ -398,6 +414,33 @@ def import_markerSet(markersetpath):
     
     return markers, segment, uniqueSegs, segID, mkcoordL, num_mks
     
+def import_simTrajectories(datapath):
+    '''
+    Import simulated marker trajectories saved by generateSimTrajectories()
+
+    Parameters
+    ----------
+    datapath : string
+        Path to .pickle or .hdf5 file of simulated trajectories
+
+    Returns
+    -------
+    data : list of torch tensors
+        num_frames x num_markers x 3 matrices of marker trajectories.
+
+    '''
+    if h5py.is_hdf5(datapath):
+        with h5py.File(datapath,'r') as hf:
+            coords = hf['coords'][()]
+            offsets = hf['offsets'][()]
+        # Segments are views into the single coordinate array
+        data = [torch.from_numpy(x) for x in np.split(coords,offsets[1:-1])]
+    else:
+        with open(datapath,'rb') as f:
+            data = pickle.load(f)
+    
+    return data
+
 def align(data,m1,m2):
     '''
     Rotate points about z-axis (vertical) so that participant is facing +x direction.
@@ -730,7 +773,7 @@ def get_trainingVals(data_segs,uniqueSegs,segID):
     for i in I:
         for m in range(int(data_segs[i].shape[1])):
             # marker distances relative to marker m
-            xyz = data_segs[i] - data_segs[i][:,m,:].unsqueeze(1).repeat(1,data_segs[i].shape[1],1)
+            xyz = data_segs[i] - data_segs[i][:,m,:].unsqueeze(1)
             xyz_v = xyz[1:,:,:] - xyz[0:xyz.shape[0]-1,:,:]
             xyz_v_norm = xyz_v.norm(dim=2)
             xyz_a = xyz_v[1:,:,:] - xyz_v[0:xyz_v.shape[0]-1,:,:]
@@ -802,7 +845,7 @@ class markerdata(torch.utils.data.Dataset):
         if (mksvis == xyz_raw.shape[0]).sum() > num_mks:
             # then also sort by distance
             xyz_raw = xyz_raw[:,mksvis==xyz_raw.shape[0],:]
-            d = (xyz_raw - xyz_m.unsqueeze(1).repeat(1,xyz_raw.shape[1],1)).norm(dim=2)
+            d = (xyz_raw - xyz_m.unsqueeze(1)).norm(dim=2)
             _,I = (d.mean(0)).sort()
             xyz_raw = xyz_raw[:,I[0:num_mks-1],:]
         else:
@@ -817,7 +860,7 @@ class markerdata(torch.utils.data.Dataset):
                 # if there somehow ended up to be empty frames, delete them
                 xyz_m = xyz_m[~torch.isnan(xyz_raw[:,:,0]).any(1),:]
                 xyz_raw = xyz_raw[~torch.isnan(xyz_raw[:,:,0]).any(1),:,:]
-        xyz_raw = xyz_raw - xyz_m.unsqueeze(1).repeat(1,xyz_raw.shape[1],1)
+        xyz_raw = xyz_raw - xyz_m.unsqueeze(1) # broadcast, no repeated copy of xyz_m
         d = (xyz_raw.mean(dim=0)).norm(dim=1)
         _, I = d.sort() # Sort trajectories by distance relative to marker m
         xyz = xyz_raw[:,I,:]
@@ -919,7 +962,8 @@ def train_nn(data_segs,num_mks,max_len,windowIdx,scaleVals,num_epochs,prevModel,
     # Create dataset and torch data loader
     traindata = markerdata(data_segs,num_mks,windowIdx,scaleVals)
     trainloader = torch.utils.data.DataLoader(traindata,batch_size=batch_size,
-                                              shuffle=True,collate_fn=pad_collate)
+                                              shuffle=True,collate_fn=pad_collate,
+                                              pin_memory=(device.type == 'cuda'))
     # Create neural net
     net = Net(max_len,num_mks).to(device)
     
@@ -948,7 +992,7 @@ def train_nn(data_segs,num_mks,max_len,windowIdx,scaleVals,num_epochs,prevModel,
     total_step = len(trainloader)
     for epoch in range(epoch0,num_epochs):
         for i, (data, labels, trials, data_lens) in enumerate(trainloader):
-            data = data.to(device)
+            data = data.to(device,non_blocking=True)
             labels = torch.LongTensor(labels)
             labels = labels.to(device)
             
@@ -1010,19 +1054,19 @@ def predict_nn(modelpath,pts,windowIdx,scaleVals,num_mks,max_len):
     
     dataset = markerdata([torch.from_numpy(pts)],num_mks,windowIdx,scaleVals)
     dataloader = torch.utils.data.DataLoader(dataset,batch_size=batch_size,
-                                             shuffle=False,collate_fn=pad_collate)
+                                             shuffle=False,collate_fn=pad_collate,
+                                             pin_memory=(device.type == 'cuda'))
     
     # Apply neural net
     sm = nn.Softmax(dim=1)
     net.eval() 
-    with torch.no_grad():
+    with torch.inference_mode():
         probWindow = torch.zeros(len(windowIdx),num_mks)
         k = 0
         for data, trajNo, segIdx, data_lens in dataloader:
             if data is not None:
-                data = data.to(device)
+                data = data.to(device,non_blocking=True)
                 outputs = net(data, data_lens)
-                _,predicted = torch.max(outputs.data,1)
                 
                 # Get probabilities for each window
                 outputs = sm(outputs)
@@ -1111,8 +1155,7 @@ def marker_label(pts,modelpath,trainvalpath,markersetpath,fs,windowSize):
     # Convert to frame-by-frame probabilities
     probFrame = torch.zeros(pts.shape[1],num_mks,pts.shape[0])
     for t in range(len(windowIdx)):
-        probFrame[windowIdx[t][1],:,windowIdx[t][2]:windowIdx[t][3]] = \
-            probWindow[t,:].repeat(windowIdx[t][3]-windowIdx[t][2],1).t().unsqueeze(dim=0)
+        probFrame[windowIdx[t][1],:,windowIdx[t][2]:windowIdx[t][3]] = probWindow[t,:].unsqueeze(1)
 
     # Find all frames where any marker appears or disappears
     keyframes = [0]
@@ -1581,3 +1624,34 @@ def export_labelled_c3d(pts,labels,rotang,filenamein,filenameout,markers,gapsize
                 out['data']['meta_points']['camera_masks'].shape[0],
                 pts_out.shape[1],pts_out.shape[0]),dtype=bool)
     out.write(filenameout)
+
+def export_simTrajectories_hdf5(data,outputfile):
+    '''
+    Export simulated marker trajectories to an .hdf5 file. All segments are 
+    concatenated into a single chunked 'coords' dataset 
+    (total_frames x num_markers x 3) with the same dtype as the segments, and 
+    'offsets' holds the start frame of each segment followed by the total 
+    number of frames.
+
+    Parameters
+    ----------
+    data : list of torch tensors
+        num_frames x num_markers x 3 matrices of marker trajectories.
+    outputfile : string
+        Path to save .hdf5 file.
+
+    Returns
+    -------
+    None.
+
+    '''
+    num_mks = data[0].shape[1]
+    lengths = np.array([x.shape[0] for x in data],dtype=np.int64)
+    offsets = np.concatenate([[0],np.cumsum(lengths)])
+    with h5py.File(outputfile,'w',libver='latest') as hf:
+        coords = hf.create_dataset('coords',shape=(offsets[-1],num_mks,3),
+                                   maxshape=(None,num_mks,3),dtype=data[0].numpy().dtype,
+                                   chunks=(240,num_mks,3))
+        for i in range(len(data)):
+            coords[offsets[i]:offsets[i+1]] = data[i].numpy()
+        hf.create_dataset('offsets',data=offsets)
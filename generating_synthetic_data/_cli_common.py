@@ -0,0 +1,84 @@
+# -*- coding: utf-8 -*-
+"""
+Shared validation and console output for the synthetic data generation scripts.
+
+Used by generate_synthetic_data.py and config_template.py.
+"""
+
+import os
+
+RULE = "=" * 70
+
+ZENODO_URL = "https://doi.org/10.5281/zenodo.4293999"
+
+CONFIG_FORMAT = (
+    "Body kinematics:    {bodykin}\n"
+    "Marker set:         {markerset}\n"
+    "Output file:        {output}\n"
+    "Alignment markers:  {align_right} (R) / {align_left} (L)\n"
+    "Sampling frequency: {fs} Hz\n"
+    "Participants:       {num_participants} / 100\n"
+    "Max segment length: {max_len} frames"
+)
+
+SUMMARY_FORMAT = (
+    "Total segments:      {num_segments}\n"
+    "Markers per segment: {num_markers}\n"
+    "Segment lengths:     {min_len} - {max_len} frames\n"
+    "Time elapsed:        {elapsed:.1f} seconds ({minutes:.1f} minutes)\n"
+    "Output saved to:     {output}"
+)
+
+
+def validate_inputs(bodykin, markerset, num_participants):
+    """Check input files and participant count.
+
+    Returns a list of error lines. Lines starting with spaces are hints that
+    continue the error before them.
+    """
+    errors = []
+    if not os.path.exists(bodykin):
+        errors.append(f"Body kinematics file not found: {bodykin}")
+        errors.append(f"  Download from: {ZENODO_URL}")
+
+    if not os.path.exists(markerset):
+        errors.append(f"Marker set file not found: {markerset}")
+
+    if num_participants < 1 or num_participants > 100:
+        errors.append(f"num_participants must be between 1 and 100, got {num_participants}")
+
+    return errors
+
+
+def validate_output(output, fileformat):
+    """Check that the output extension matches fileformat. Returns a list of error lines."""
+    errors = []
+    is_hdf5_ext = os.path.splitext(output)[1] in ['.h5', '.hdf5']
+    if is_hdf5_ext != (fileformat == 'hdf5'):
+        errors.append(f"Output file extension does not match format '{fileformat}': {output}")
+        errors.append("  Use .h5/.hdf5 for hdf5 output and any other extension for pickle")
+    return errors
+
+
+def print_config(cfg):
+    """Print the generation configuration.
+
+    cfg is a dict with the keys used in CONFIG_FORMAT.
+    """
+    print(CONFIG_FORMAT.format(**cfg))
+
+
+def print_summary(data, elapsed_time, output):
+    """Print the summary block after generation completes."""
+    print(RULE)
+    print("GENERATION COMPLETE")
+    print(RULE)
+    print(SUMMARY_FORMAT.format(
+        num_segments=len(data),
+        num_markers=data[0].shape[1],
+        min_len=min(x.shape[0] for x in data),
+        max_len=max(x.shape[0] for x in data),
+        elapsed=elapsed_time,
+        minutes=elapsed_time / 60,
+        output=os.path.abspath(output),
+    ))
@@ -19,17 +19,33 @@ import h5py
 import numpy as np
 
 
-def print_group_structure(group, indent=0):
-    """Recursively print HDF5 group structure."""
-    for key in group.keys():
-        item = group[key]
-        prefix = "  " * indent
+def print_group_structure(group, max_depth=3):
+    """Print HDF5 group structure using h5py's native traversal."""
+    lines = []
+
+    def _print_item(name, item):
+        depth = name.count('/')
+        if depth > max_depth:  # Limit printed depth
+            return None
+        prefix = "  " * depth
+        key = name.rsplit('/', 1)[-1]
         if isinstance(item, h5py.Group):
-            print(f"{prefix}📁 {key}/")
-            if indent < 3:  # Limit recursion depth
-                print_group_structure(item, indent + 1)
+            lines.append(f"{prefix}📁 {key}/")
         elif isinstance(item, h5py.Dataset):
-            print(f"{prefix}📄 {key} - shape: {item.shape}, dtype: {item.dtype}")
+            lines.append(f"{prefix}📄 {key} - shape: {item.shape}, dtype: {item.dtype}")
+        return None
+
+    group.visititems(_print_item)
+    # Write the whole listing at once rather than one print() per item
+    if lines:
+        sys.stdout.write('\n'.join(lines) + '\n')
+
+
+def read_dataset(ds):
+    """Read a full HDF5 dataset into a preallocated array."""
+    buf = np.empty(ds.shape, dtype=ds.dtype)
+    ds.read_direct(buf)
+    return buf
 
 
 def main():
@@ -43,23 +59,31 @@ def main():
 
     args = parser.parse_args()
 
-    if not os.path.exists(args.hdf5_file):
+    try:
+        file_size = os.stat(args.hdf5_file).st_size
+    except (FileNotFoundError, NotADirectoryError):
         print(f"ERROR: File not found: {args.hdf5_file}")
         print()
         print("Download the body kinematics data from:")
         print("https://doi.org/10.5281/zenodo.4293999")
         sys.exit(1)
+    except OSError as e:
+        print(f"ERROR: Cannot access file: {args.hdf5_file} ({e.strerror})")
+        sys.exit(1)
 
     print("=" * 70)
     print("BODY KINEMATICS HDF5 FILE INSPECTION")
     print("=" * 70)
     print(f"File: {os.path.abspath(args.hdf5_file)}")
-    print(f"Size: {os.path.getsize(args.hdf5_file) / (1024**3):.2f} GB")
+    print(f"Size: {file_size / (1024**3):.2f} GB")
     print("=" * 70)
     print()
 
     try:
-        with h5py.File(args.hdf5_file, 'r') as hf:
+        # Larger chunk cache so verbose reads across participants reuse chunks.
+        # libver only bounds object formats HDF5 may use, so it is safe read-only.
+        with h5py.File(args.hdf5_file, 'r', libver='latest', rdcc_nbytes=64*1024*1024,
+                       rdcc_nslots=5003, rdcc_w0=0.75) as hf:
             # Top-level groups
             print("📦 TOP-LEVEL GROUPS:")
             print("-" * 70)
@@ -71,14 +95,16 @@ def main():
             if 'kin' in hf:
                 print("🏃 KINEMATICS DATA:")
                 print("-" * 70)
-                sids = list(hf['kin'].keys())
+                kin = hf['kin']
+                sids = list(kin.keys())
                 print(f"Number of participants: {len(sids)}")
                 print(f"Participant IDs: {', '.join(sids[:5])}{'...' if len(sids) > 5 else ''}")
                 print()
 
                 # Sample one participant
                 sample_sid = sids[0]
-                trials = list(hf['kin'][sample_sid].keys())
+                sid_grp = kin[sample_sid]
+                trials = list(sid_grp.keys())
                 print(f"Example participant: {sample_sid}")
                 print(f"  Trials: {len(trials)}")
                 print(f"  Trial names: {', '.join(trials[:5])}{'...' if len(trials) > 5 else ''}")
@@ -86,11 +112,12 @@ def main():
 
                 # Sample one trial
                 sample_trial = trials[0]
-                segments = list(hf['kin'][sample_sid][sample_trial].keys())
+                trial_grp = sid_grp[sample_trial]
+                segments = list(trial_grp.keys())
                 print(f"  Example trial: {sample_trial}")
                 print(f"    Body segments: {len(segments)}")
                 for seg in segments:
-                    data = hf['kin'][sample_sid][sample_trial][seg]
+                    data = trial_grp[seg]
                     print(f"      • {seg:15s} - shape: {data.shape}")
                 print()
 
@@ -98,10 +125,11 @@ def main():
             if 'com' in hf:
                 print("📍 CENTER OF MASS DATA:")
                 print("-" * 70)
-                com_segments = list(hf['com'].keys())
+                com = hf['com']
+                com_segments = list(com.keys())
                 print(f"Body segments: {len(com_segments)}")
                 for seg in com_segments:
-                    data = hf['com'][seg]
+                    data = com[seg]
                     print(f"  • {seg:15s} - shape: {data.shape} (participants × 3)")
                 print()
 
@@ -109,10 +137,11 @@ def main():
             if 'scale' in hf:
                 print("📏 SCALE DATA (Body Dimensions):")
                 print("-" * 70)
-                scale_segments = list(hf['scale'].keys())
+                scale = hf['scale']
+                scale_segments = list(scale.keys())
                 print(f"Body segments: {len(scale_segments)}")
                 for seg in scale_segments:
-                    data = hf['scale'][seg]
+                    data = scale[seg]
                     print(f"  • {seg:15s} - shape: {data.shape} (participants × 3)")
                 print()
 
@@ -121,13 +150,13 @@ def main():
                 print("🔍 SAMPLE DATA:")
                 print("-" * 70)
                 if 'kin' in hf:
-                    sample_data = np.array(hf['kin'][sids[0]][trials[0]]['torso'])
+                    sample_data = read_dataset(trial_grp['torso'])
                     print(f"Sample transformation matrix (torso, frame 0):")
                     print(sample_data[:, :, 0])
                     print()
 
                 if 'scale' in hf:
-                    sample_scale = np.array(hf['scale']['torso'])
+                    sample_scale = read_dataset(scale['torso'])
                     print(f"Sample scale factors (torso, first 3 participants):")
                     print(sample_scale[:3, :])
                     print()
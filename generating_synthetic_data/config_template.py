@@ -15,7 +15,7 @@ import os
 # Add parent directory to path
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-import automarkerlabel as aml
+from _cli_common import RULE, validate_inputs, validate_output, print_config, print_summary
 
 # ============================================================================
 # CONFIGURATION - EDIT THESE PARAMETERS
@@ -76,18 +76,13 @@ def validate_config():
     errors = []
     warnings = []
 
-    # Check files exist
-    if not os.path.exists(BODYKIN_PATH):
-        errors.append(f"Body kinematics file not found: {BODYKIN_PATH}")
-        errors.append("  Download from: https://doi.org/10.5281/zenodo.4293999")
+    # Check files exist and participant count
+    errors.extend(validate_inputs(BODYKIN_PATH, MARKERSET_PATH, NUM_PARTICIPANTS))
 
-    if not os.path.exists(MARKERSET_PATH):
-        errors.append(f"Marker set file not found: {MARKERSET_PATH}")
+    # generateSimTrajectories is called without fileformat, so output is pickle
+    errors.extend(validate_output(OUTPUT_PATH, 'pickle'))
 
     # Check parameters
-    if NUM_PARTICIPANTS < 1 or NUM_PARTICIPANTS > 100:
-        errors.append(f"NUM_PARTICIPANTS must be 1-100, got {NUM_PARTICIPANTS}")
-
     if SAMPLING_FREQUENCY < 50 or SAMPLING_FREQUENCY > 500:
         warnings.append(f"Unusual sampling frequency: {SAMPLING_FREQUENCY} Hz")
         warnings.append("  Common values: 120, 240 Hz")
@@ -109,21 +104,24 @@ def validate_config():
 # ============================================================================
 
 def main():
-    print("=" * 70)
+    print(RULE)
     print("SYNTHETIC TRAJECTORY GENERATION - CONFIGURATION")
-    print("=" * 70)
+    print(RULE)
     print()
 
     # Display configuration
     print("CONFIGURATION:")
     print("-" * 70)
-    print(f"Body kinematics:    {BODYKIN_PATH}")
-    print(f"Marker set:         {MARKERSET_PATH}")
-    print(f"Output file:        {OUTPUT_PATH}")
-    print(f"Alignment markers:  {ALIGN_MARKER_RIGHT} (R) / {ALIGN_MARKER_LEFT} (L)")
-    print(f"Sampling frequency: {SAMPLING_FREQUENCY} Hz")
-    print(f"Participants:       {NUM_PARTICIPANTS} / 100")
-    print(f"Max segment length: {MAX_SEGMENT_LENGTH} frames")
+    print_config({
+        'bodykin': BODYKIN_PATH,
+        'markerset': MARKERSET_PATH,
+        'output': OUTPUT_PATH,
+        'align_right': ALIGN_MARKER_RIGHT,
+        'align_left': ALIGN_MARKER_LEFT,
+        'fs': SAMPLING_FREQUENCY,
+        'num_participants': NUM_PARTICIPANTS,
+        'max_len': MAX_SEGMENT_LENGTH,
+    })
     print()
 
     # Validate
@@ -155,19 +153,19 @@ def main():
         sys.exit(0)
 
     print()
-    print("=" * 70)
+    print(RULE)
     print("STARTING GENERATION")
-    print("=" * 70)
+    print(RULE)
     print()
 
     # Create output directory if needed
     output_dir = os.path.dirname(OUTPUT_PATH)
-    if output_dir and not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-        print(f"Created directory: {output_dir}")
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
 
-    # Generate
+    # Generate (automarkerlabel is imported here so validation doesn't wait for torch)
     import time
+    import automarkerlabel as aml
     start_time = time.time()
 
     data = aml.generateSimTrajectories(
@@ -185,18 +183,12 @@ def main():
 
     # Summary
     print()
-    print("=" * 70)
-    print("GENERATION COMPLETE")
-    print("=" * 70)
-    print(f"Total segments:      {len(data)}")
-    print(f"Markers per segment: {data[0].shape[1]}")
-    print(f"Time elapsed:        {elapsed_time:.1f} seconds ({elapsed_time/60:.1f} min)")
-    print(f"Output saved to:     {os.path.abspath(OUTPUT_PATH)}")
+    print_summary(data, elapsed_time, OUTPUT_PATH)
     print()
     print("Next steps:")
     print(f"  1. Inspect data: python inspect_synthetic_data.py {OUTPUT_PATH}")
     print(f"  2. Train model:  python ../trainAlgorithm.py")
-    print("=" * 70)
+    print(RULE)
 
 
 if __name__ == '__main__':
@@ -24,7 +24,7 @@ import time
 # Add parent directory to path to import automarkerlabel
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
-import automarkerlabel as aml
+from _cli_common import RULE, validate_inputs, validate_output, print_config, print_summary
 
 
 def main():
@@ -57,7 +57,7 @@ Examples:
     parser.add_argument('--markerset', type=str, required=True,
                         help='Path to OpenSim marker set XML file')
     parser.add_argument('--output', type=str, required=True,
-                        help='Output path for .pickle file')
+                        help='Output path for .pickle or .hdf5 file')
     parser.add_argument('--align-right', type=str, required=True,
                         help='Right-side alignment marker name (e.g., RAC, RSHO, RASI)')
     parser.add_argument('--align-left', type=str, required=True,
@@ -70,43 +70,37 @@ Examples:
                         help='Number of participants to use (1-100, default: 100)')
     parser.add_argument('--max-len', type=int, default=240,
                         help='Maximum segment length in frames (default: 240)')
+    parser.add_argument('--format', type=str, default='pickle', choices=['pickle', 'hdf5'],
+                        help='Output file format (default: pickle)')
 
     args = parser.parse_args()
 
     # Validate inputs
-    if not os.path.exists(args.bodykin):
-        print(f"ERROR: Body kinematics file not found: {args.bodykin}")
-        print("Download from: https://doi.org/10.5281/zenodo.4293999")
-        sys.exit(1)
-
-    if not os.path.exists(args.markerset):
-        print(f"ERROR: Marker set file not found: {args.markerset}")
-        sys.exit(1)
-
-    if args.num_participants < 1 or args.num_participants > 100:
-        print(f"ERROR: num_participants must be between 1 and 100")
+    errors = validate_inputs(args.bodykin, args.markerset, args.num_participants)
+    errors.extend(validate_output(args.output, args.format))
+    if errors:
+        for e in errors:
+            # Indented items are hints that belong to the error above them
+            print(e.lstrip() if e.startswith(' ') else f"ERROR: {e}")
         sys.exit(1)
 
     # Create output directory if needed
     output_dir = os.path.dirname(args.output)
-    if output_dir and not os.path.exists(output_dir):
-        os.makedirs(output_dir)
-        print(f"Created output directory: {output_dir}")
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
 
     # Display configuration
-    print("=" * 70)
+    print(RULE)
     print("SYNTHETIC TRAJECTORY GENERATION")
-    print("=" * 70)
-    print(f"Body kinematics:    {args.bodykin}")
-    print(f"Marker set:         {args.markerset}")
-    print(f"Output file:        {args.output}")
-    print(f"Alignment markers:  {args.align_right} (R) / {args.align_left} (L)")
-    print(f"Sampling frequency: {args.fs} Hz")
-    print(f"Participants:       {args.num_participants} / 100")
-    print(f"Max segment length: {args.max_len} frames")
-    print("=" * 70)
+    print(RULE)
+    print_config(vars(args))
+    print(f"Output format:      {args.format}")
+    print(RULE)
     print()
 
+    # Imported here so --help and input errors don't wait for torch to load
+    import automarkerlabel as aml
+
     # Generate trajectories
     print("Starting generation...")
     start_time = time.time()
@@ -120,22 +114,16 @@ Examples:
             alignMkL=args.align_left,
             fs=args.fs,
             num_participants=args.num_participants,
-            max_len=args.max_len
+            max_len=args.max_len,
+            fileformat=args.format
         )
 
         elapsed_time = time.time() - start_time
 
         # Summary statistics
         print()
-        print("=" * 70)
-        print("GENERATION COMPLETE")
-        print("=" * 70)
-        print(f"Total segments:     {len(data)}")
-        print(f"Markers per segment: {data[0].shape[1]}")
-        print(f"Segment lengths:    {min([x.shape[0] for x in data])} - {max([x.shape[0] for x in data])} frames")
-        print(f"Time elapsed:       {elapsed_time:.1f} seconds ({elapsed_time/60:.1f} minutes)")
-        print(f"Output saved to:    {os.path.abspath(args.output)}")
-        print("=" * 70)
+        print_summary(data, elapsed_time, args.output)
+        print(RULE)
         print()
         print("Next step: Train the model using trainAlgorithm.py")
 
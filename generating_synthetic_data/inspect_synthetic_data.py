@@ -3,11 +3,16 @@
 """
 Inspect generated synthetic marker trajectory data.
 
-This script verifies that the generated pickle file contains valid data
-and displays statistics about the synthetic dataset.
+This script verifies that the generated pickle (or hdf5) file contains valid
+data and displays statistics about the synthetic dataset.
 
 Usage:
     python inspect_synthetic_data.py ../data/simulatedTrajectories.pickle
+    python inspect_synthetic_data.py ../data/simulatedTrajectories.hdf5
+
+Pickle files are loaded into memory in full. Files written with --format hdf5
+are read segment by segment only when --verbose or --check-nans needs the
+coordinates.
 
 Author: aclouthi@uottawa.ca
 """
@@ -16,16 +21,88 @@ import sys
 import os
 import argparse
 import pickle
-import torch
 import numpy as np
 
 
+# Signature at the start of every hdf5 file written by generateSimTrajectories
+HDF5_SIGNATURE = b'\x89HDF\r\n\x1a\n'
+
+
+def _is_hdf5(path):
+    """Check the file signature so pickle inputs never need h5py."""
+    with open(path, 'rb') as f:
+        return f.read(len(HDF5_SIGNATURE)) == HDF5_SIGNATURE
+
+
+class _HDF5Segments:
+    """Segments of an hdf5 file written with --format hdf5, read on demand.
+
+    Only the offsets are read up front, so segment lengths are available without
+    touching the coordinates. The file stays open for the life of the script.
+    """
+
+    def __init__(self, path):
+        import h5py  # Only needed for hdf5 files
+        self.hf = h5py.File(path, 'r', rdcc_nbytes=64*1024*1024)
+        self.coords = self.hf['coords']
+        self.offsets = self.hf['offsets'][()]
+        self.lengths = np.diff(self.offsets)
+
+    def __len__(self):
+        return len(self.lengths)
+
+    def __getitem__(self, i):
+        return self.coords[self.offsets[i]:self.offsets[i+1]]
+
+    def __iter__(self):
+        for i in range(len(self)):
+            yield self[i]
+
+
+def _load_segments(path):
+    """Load segments from a pickle file or an hdf5 file written with --format hdf5.
+
+    Segments are returned as numpy arrays. Torch tensors from pickle files are
+    converted with .numpy(), which shares memory with the tensor. Segments of
+    hdf5 files are only read when accessed.
+    """
+    if _is_hdf5(path):
+        return _HDF5Segments(path)
+    # Unpickling torch tensors imports torch on demand
+    with open(path, 'rb') as f:
+        data = pickle.load(f)
+    return [seg.numpy() if hasattr(seg, 'numpy') else seg for seg in data]
+
+
+def _coordinate_stats(data):
+    """Per-axis min, max, mean, std and count of all non-NaN coordinates in one pass."""
+    count = np.zeros(3)
+    total = np.zeros(3)
+    total_sq = np.zeros(3)
+    lo = np.full(3, np.nan)
+    hi = np.full(3, np.nan)
+    for seg in data:
+        a = seg.reshape(-1, 3)
+        # fmin/fmax skip NaNs without the all-NaN warnings of nanmin/nanmax;
+        # initial=nan lets empty segments reduce without a ValueError
+        lo = np.fmin(lo, np.fmin.reduce(a, axis=0, initial=np.nan))
+        hi = np.fmax(hi, np.fmax.reduce(a, axis=0, initial=np.nan))
+        valid = ~np.isnan(a)
+        a = np.where(valid, a, 0)
+        count += valid.sum(0)
+        total += a.sum(0)
+        total_sq += (a * a).sum(0)
+    mean = total / count
+    std = np.sqrt(np.maximum(total_sq / count - mean**2, 0))
+    return lo, hi, mean, std, count
+
+
 def main():
     parser = argparse.ArgumentParser(
         description='Inspect generated synthetic trajectory data'
     )
     parser.add_argument('pickle_file', type=str,
-                        help='Path to .pickle file containing synthetic trajectories')
+                        help='Path to .pickle or .hdf5 file containing synthetic trajectories')
     parser.add_argument('--verbose', '-v', action='store_true',
                         help='Show detailed statistics')
     parser.add_argument('--check-nans', action='store_true',
@@ -33,23 +110,27 @@ def main():
 
     args = parser.parse_args()
 
-    if not os.path.exists(args.pickle_file):
+    try:
+        file_size = os.stat(args.pickle_file).st_size
+    except (FileNotFoundError, NotADirectoryError):
         print(f"ERROR: File not found: {args.pickle_file}")
         sys.exit(1)
+    except OSError as e:
+        print(f"ERROR: Cannot access file: {args.pickle_file} ({e.strerror})")
+        sys.exit(1)
 
     print("=" * 70)
     print("SYNTHETIC TRAJECTORY DATA INSPECTION")
     print("=" * 70)
     print(f"File: {os.path.abspath(args.pickle_file)}")
-    print(f"Size: {os.path.getsize(args.pickle_file) / (1024**2):.2f} MB")
+    print(f"Size: {file_size / (1024**2):.2f} MB")
     print("=" * 70)
     print()
 
     try:
         # Load data
         print("Loading data...")
-        with open(args.pickle_file, 'rb') as f:
-            data = pickle.load(f)
+        data = _load_segments(args.pickle_file)
 
         print(f"✓ Loaded successfully")
         print()
@@ -58,59 +139,72 @@ def main():
         print("📊 DATASET STATISTICS:")
         print("-" * 70)
         print(f"Number of segments:  {len(data)}")
-        print(f"Data type:           {type(data[0])}")
+        print(f"Data type:           {data[0].dtype}")
 
+        memory_mb = 0.0
         if len(data) > 0:
+            # All segments share dtype and marker count, so sample them once
             num_markers = data[0].shape[1]
+            bytes_per_frame = data[0].itemsize * num_markers * 3
             print(f"Number of markers:   {num_markers}")
             print()
 
             # Segment length statistics
-            lengths = [seg.shape[0] for seg in data]
+            if isinstance(data, _HDF5Segments):
+                lengths = data.lengths
+            else:
+                lengths = np.fromiter((seg.shape[0] for seg in data), dtype=np.int32, count=len(data))
+            memory_mb = bytes_per_frame * int(lengths.sum()) / (1024**2)
+            # One sort gives min, median and max together
+            len_min, len_median, len_max = np.quantile(lengths, [0, 0.5, 1])
             print("📏 SEGMENT LENGTH STATISTICS:")
             print("-" * 70)
-            print(f"  Minimum:           {min(lengths)} frames")
-            print(f"  Maximum:           {max(lengths)} frames")
-            print(f"  Mean:              {np.mean(lengths):.1f} frames")
-            print(f"  Median:            {np.median(lengths):.0f} frames")
-            print(f"  Std deviation:     {np.std(lengths):.1f} frames")
+            print(f"  Minimum:           {int(len_min)} frames")
+            print(f"  Maximum:           {int(len_max)} frames")
+            print(f"  Mean:              {lengths.mean():.1f} frames")
+            print(f"  Median:            {len_median:.0f} frames")
+            print(f"  Std deviation:     {lengths.std():.1f} frames")
             print()
 
             # Length distribution
             bins = [0, 60, 120, 180, 240, 300]
-            hist, _ = np.histogram(lengths, bins=bins)
+            # Lengths are integers, so bumping the last edge by one keeps it inclusive
+            # as in np.histogram and puts only lengths > bins[-1] in the overflow bin
+            edges = np.array(bins)
+            edges[-1] += 1
+            counts = np.bincount(np.digitize(lengths, edges), minlength=len(bins) + 1)
+            hist = counts[1:len(bins)]
+            count = counts[len(bins)]
             print("  Length distribution:")
             for i in range(len(bins) - 1):
                 print(f"    {bins[i]:3d}-{bins[i+1]:3d} frames: {hist[i]:5d} segments ({100*hist[i]/len(data):.1f}%)")
-            if max(lengths) > bins[-1]:
-                count = sum(1 for l in lengths if l > bins[-1])
+            if count > 0:
                 print(f"    >{bins[-1]:3d} frames:       {count:5d} segments ({100*count/len(data):.1f}%)")
             print()
 
-            # Coordinate statistics
-            print("🗺️  COORDINATE STATISTICS:")
-            print("-" * 70)
-
-            # Flatten all data
-            all_coords = torch.cat([seg.reshape(-1, 3) for seg in data], dim=0)
-            all_coords_np = all_coords.numpy()
+            # Coordinate statistics need a full pass over the data, so only
+            # compute them when a detailed inspection was requested
+            if args.verbose or args.check_nans:
+                print("🗺️  COORDINATE STATISTICS:")
+                print("-" * 70)
 
-            for axis, name in enumerate(['X', 'Y', 'Z']):
-                valid_coords = all_coords_np[~np.isnan(all_coords_np[:, axis]), axis]
-                print(f"  {name}-axis (mm):")
-                print(f"    Min:    {np.min(valid_coords):8.1f}")
-                print(f"    Max:    {np.max(valid_coords):8.1f}")
-                print(f"    Mean:   {np.mean(valid_coords):8.1f}")
-                print(f"    Std:    {np.std(valid_coords):8.1f}")
+                coord_min, coord_max, coord_mean, coord_std, coord_count = _coordinate_stats(data)
+                for axis, name in enumerate(['X', 'Y', 'Z']):
+                    print(f"  {name}-axis (mm):")
+                    print(f"    Min:    {coord_min[axis]:8.1f}")
+                    print(f"    Max:    {coord_max[axis]:8.1f}")
+                    print(f"    Mean:   {coord_mean[axis]:8.1f}")
+                    print(f"    Std:    {coord_std[axis]:8.1f}")
 
-            print()
+                print()
 
             # Check for NaNs
             if args.check_nans:
                 print("🔍 NaN ANALYSIS:")
                 print("-" * 70)
-                total_values = sum(seg.numel() for seg in data)
-                total_nans = sum(torch.isnan(seg).sum().item() for seg in data)
+                total_values = int(lengths.sum()) * num_markers * 3
+                # Values not counted as valid by the coordinate pass are NaNs
+                total_nans = total_values - int(coord_count.sum())
                 print(f"  Total values:      {total_values:,}")
                 print(f"  NaN values:        {total_nans:,} ({100*total_nans/total_values:.3f}%)")
 
@@ -132,26 +226,31 @@ def main():
 
                 print("📈 DETAILED SEGMENT INFORMATION:")
                 print("-" * 70)
-                print(f"{'Segment':<10} {'Frames':<8} {'Shape':<20} {'Data Range (mm)':<25}")
-                print("-" * 70)
+                # Build the table and write it once rather than one print() per row
+                lines = [f"{'Segment':<10} {'Frames':<8} {'Shape':<20} {'Data Range (mm)':<25}",
+                         "-" * 70]
                 for i in range(min(10, len(data))):
                     seg = data[i]
-                    seg_np = seg.numpy()
-                    valid_data = seg_np[~np.isnan(seg_np)]
-                    if len(valid_data) > 0:
-                        data_range = f"{np.min(valid_data):.0f} to {np.max(valid_data):.0f}"
-                    else:
+                    try:
+                        lo = np.fmin.reduce(seg, axis=None)
+                        hi = np.fmax.reduce(seg, axis=None)
+                    except ValueError:  # Empty segment
+                        lo = hi = np.nan
+                    if np.isnan(lo):
                         data_range = "N/A"
-                    print(f"{i:<10} {seg.shape[0]:<8} {str(seg.shape):<20} {data_range:<25}")
+                    else:
+                        data_range = f"{lo:.0f} to {hi:.0f}"
+                    lines.append(f"{i:<10} {seg.shape[0]:<8} {str(seg.shape):<20} {data_range:<25}")
                 if len(data) > 10:
-                    print(f"... and {len(data) - 10} more segments")
-                print()
+                    lines.append(f"... and {len(data) - 10} more segments")
+                sys.stdout.write('\n'.join(lines) + '\n\n')
 
         # Memory usage
-        memory_mb = sum(seg.element_size() * seg.numel() for seg in data) / (1024**2)
         print("💾 MEMORY USAGE:")
         print("-" * 70)
         print(f"  In-memory size:    {memory_mb:.2f} MB")
+        if isinstance(data, _HDF5Segments):
+            print(f"  Stored size:       {data.coords.id.get_storage_size() / (1024**2):.2f} MB")
         print()
 
         print("=" * 70)